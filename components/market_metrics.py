@@ -6,6 +6,7 @@ import plotly.express as px
 from utils.api_client import YahooAPIClient
 from utils.api_client import GroqHelper
 from utils.data_processing import process_market_data
+from utils.cache import cached
 
 
 api_key=os.environ.get("GROQ_API_KEY")
@@ -14,7 +15,7 @@ class CurrencyMetrics:
     def __init__(self):
         self.api_client = GroqHelper(api_key)
     
-    @st.cache_data(ttl=300)
+    @cached(ttl=300, max_entries=50)
     def fetch_market_data(_self, symbol):
         prompt = f'''
             Search input for coin: {symbol}
@@ -133,7 +134,7 @@ class MarketMetrics:
     def __init__(self):
         self.api_client = YahooAPIClient()
     
-    @st.cache_data(ttl=300)
+    @cached(ttl=300, max_entries=50)
     def fetch_market_data(_self, crypto, timeframe):
         
         return _self.api_client.get_market_data(crypto, timeframe)
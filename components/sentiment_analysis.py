@@ -2,14 +2,15 @@ import streamlit as st
 import plotly.express as px
 from utils.api_client import RedditAPIClient
 from utils.data_processing import process_sentiment_data
+from utils.cache import cached
 
 class SentimentAnalysis:
     def __init__(self):
         self.api_client = RedditAPIClient()
     
-    @st.cache_data(ttl=300)
-    def fetch_sentiment_data(self, crypto, timeframe):
-        return self.api_client.get_sentiment_data(crypto, timeframe)
+    @cached(ttl=300, max_entries=50)
+    def fetch_sentiment_data(_self, crypto, timeframe):
+        return _self.api_client.get_sentiment_data(crypto, timeframe)
     
     def display(self, crypto, timeframe):
         st.header("Social Sentiment Analysis")
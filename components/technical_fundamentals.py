@@ -2,14 +2,15 @@ import streamlit as st
 import plotly.express as px
 from utils.api_client import GitHubAPIClient
 from utils.data_processing import process_github_data
+from utils.cache import cached
 
 class TechnicalFundamentals:
     def __init__(self):
         self.api_client = GitHubAPIClient()
     
-    @st.cache_data(ttl=3600)
-    def fetch_github_data(self, crypto):
-        return self.api_client.get_github_metrics(crypto)
+    @cached(ttl=3600, max_entries=50)
+    def fetch_github_data(_self, crypto):
+        return _self.api_client.get_github_metrics(crypto)
     
     def display(self, crypto):
         st.header("Technical Fundamentals")
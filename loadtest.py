@@ -0,0 +1,430 @@
+"""Load test for the dashboard.
+
+Starts one `streamlit run main.py` server, as deployed, and drives
+concurrent sessions through it over Streamlit's websocket protocol, the
+same way browser tabs do. The Groq API is replaced by a local stub with
+configurable latency and error rate.
+
+    python loadtest.py --sessions 50 --concurrency 10 --latency 0.5
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pyarrow as pa
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import WebSocketError, websocket_connect
+
+SYMBOLS = ["BTC", "ETH", "BNB", "XRP", "ADA"]
+WARM_UP_TIMEOUT = 120
+CACHE_EXPANDER = "Cache usage"
+
+
+class StubUpstream:
+    """Local stand-in for the Groq chat completions endpoint."""
+
+    def __init__(self, latency=0.5, jitter=0.1, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                start = time.perf_counter()
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(max(0.0, random.gauss(stub.latency, stub.jitter)))
+                failed = random.random() < stub.error_rate
+                if failed:
+                    self._send(500, {'error': {'message': 'stub upstream error'}})
+                else:
+                    self._send(200, stub.completion(body))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.errors += failed
+                    stub.busy_seconds += time.perf_counter() - start
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def completion(self, body):
+        prompt = body['messages'][-1]['content']
+        match = re.search(r'coin: (\w+)', prompt)
+        coin = match.group(1) if match else 'BTC'
+        content = {
+            'coin': coin,
+            'ticker': coin,
+            'founded': '2014-07-30T00:00:00.000Z',
+            'market_size': 24022038474.1443,
+            'current_price': 3957.7603,
+            'metrics_to_consider': ['Burn Rate', 'Open Source Development'],
+            'market_supply': 1122334521345.0,
+            'max_supply': 124333453545.0,
+            'market_cap': 454543345334.0,
+            '24_hour_volume': 125445454534.0,
+            'risk_flags': ['Burn Rate'],
+            'key_strengths': ['Active developer community'],
+            'security_score': 60,
+            'liquidity_score': 80,
+            'volatility_score': 90,
+            'promise_risk_score': 85,
+            'risk_colour': 'amber',
+        }
+        return {
+            'id': 'chatcmpl-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': json.dumps(content)},
+                'finish_reason': 'stop',
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+class ServerProcess:
+    """A `streamlit run main.py` subprocess and its CPU and memory use."""
+
+    def __init__(self, port, env):
+        self.port = port
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', 'main.py',
+             '--server.port', str(port), '--server.address', '127.0.0.1',
+             '--server.headless', 'true'],
+            env=env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        self.url = f"ws://127.0.0.1:{port}/_stcore/stream"
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health") as r:
+                    if r.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        self.log.seek(0)
+        raise RuntimeError(f"streamlit server did not start:\n{self.log.read().decode()}")
+
+    def cpu_seconds(self):
+        # Linux only; None elsewhere.
+        try:
+            with open(f"/proc/{self.process.pid}/stat") as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            return None
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def rss_bytes(self):
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except OSError:
+            return None
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+class Session:
+    """One browser tab: a websocket session that reruns main.py."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.selectbox = None
+        self.cache_lookups = None
+        self._cache_expander_path = None
+
+    async def __aenter__(self):
+        self.conn = await websocket_connect(self.url, subprotocols=['streamlit'])
+        return self
+
+    async def __aexit__(self, *exc):
+        self.conn.close()
+
+    async def render(self, symbol=None):
+        """Rerun the script and return the number of errors it displayed."""
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        if symbol is not None and self.selectbox is not None:
+            widget = msg.rerun_script.widget_states.widgets.add()
+            widget.id = self.selectbox.id
+            widget.int_value = list(self.selectbox.options).index(symbol)
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        try:
+            return await asyncio.wait_for(self._read_until_finished(), self.timeout)
+        except asyncio.TimeoutError:
+            raise RenderTimeout() from None
+
+    async def _read_until_finished(self):
+        errors = 0
+        while True:
+            data = await self.conn.read_message()
+            if data is None:
+                raise ConnectionError("server closed the session")
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof('type')
+            path = tuple(msg.metadata.delta_path)
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'add_block':
+                if msg.delta.add_block.expandable.label == CACHE_EXPANDER:
+                    self._cache_expander_path = path
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_kind = element.WhichOneof('type')
+                if element_kind == 'selectbox':
+                    self.selectbox = element.selectbox
+                elif element_kind == 'exception' or (
+                        element_kind == 'alert' and element.alert.format == Alert.ERROR):
+                    errors += 1
+                elif element_kind == 'arrow_data_frame' and self._in_cache_expander(path):
+                    self._read_cache_table(element.arrow_data_frame.data)
+            elif kind == 'script_finished':
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors += 1
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return errors
+
+
+    def _in_cache_expander(self, path):
+        expander = self._cache_expander_path
+        return expander is not None and path[:len(expander)] == expander
+
+    def _read_cache_table(self, data):
+        # Server-wide running totals, taken after this render's own lookups.
+        table = pa.ipc.open_stream(io.BytesIO(data)).read_pandas()
+        if {'hits', 'misses'} <= set(table.columns):
+            self.cache_lookups = int(table['hits'].sum()), int(table['misses'].sum())
+
+
+def latest_lookups(*snapshots):
+    # Totals only grow, so the largest snapshot is the most recent one.
+    snapshots = [s for s in snapshots if s is not None]
+    return max(snapshots, key=sum) if snapshots else None
+
+
+async def run_session(url, reruns, timeout):
+    latencies = []
+    errors = 0
+    timeouts = 0
+    lookups = None
+    async with Session(url, timeout) as session:
+        for i in range(reruns + 1):
+            start = time.perf_counter()
+            try:
+                errors += await session.render(random.choice(SYMBOLS) if i else None)
+            except RenderTimeout:
+                # The session is now out of step with the server; give it up
+                # and let the rest of the test carry on.
+                timeouts += 1
+                break
+            latencies.append(time.perf_counter() - start)
+            lookups = latest_lookups(lookups, session.cache_lookups)
+    return {'latencies': latencies, 'errors': errors, 'timeouts': timeouts,
+            'failed': False, 'cache_lookups': lookups}
+
+
+async def warm_up(url, timeout):
+    """Render once so the server imports everything, then time one more
+    render on its own with the cache warm.
+
+    Returns the server's cache totals and that render's latency.
+    """
+    async with Session(url, timeout) as session:
+        try:
+            await session.render()
+            start = time.perf_counter()
+            await session.render()
+        except RenderTimeout:
+            return None, None
+        return session.cache_lookups, time.perf_counter() - start
+
+
+async def run_load(url, args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited():
+        async with semaphore:
+            try:
+                return await run_session(url, args.reruns, args.timeout)
+            except (ConnectionError, OSError, WebSocketError):
+                # The server dropped the session; count it and carry on.
+                return {'latencies': [], 'errors': 0, 'timeouts': 0,
+                        'failed': True, 'cache_lookups': None}
+
+    return await asyncio.gather(*(limited() for _ in range(args.sessions)))
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20, help='total sessions to run')
+    parser.add_argument('--concurrency', type=int, default=5, help='sessions connected at once')
+    parser.add_argument('--reruns', type=int, default=5,
+                        help='symbol changes per session after the first render')
+    parser.add_argument('--latency', type=float, default=0.5, help='mean upstream latency (s)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='upstream latency std dev (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of upstream calls that fail (the Groq client retries them)')
+    parser.add_argument('--timeout', type=float, default=60, help='per-render timeout (s)')
+    parser.add_argument('--port', type=int, default=0,
+                        help='port for the server under test (default: a free port)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    stub = StubUpstream(args.latency, args.jitter, args.error_rate)
+    stub.start()
+    env = dict(os.environ, GROQ_BASE_URL=stub.base_url)
+    env.setdefault('GROQ_API_KEY', 'stub')
+    server = ServerProcess(args.port or free_port(), env)
+
+    try:
+        server.wait_ready()
+        # The first run imports streamlit, pandas and plotly in the server;
+        # keep it out of the measurements.
+        cache_before, warm_render = asyncio.run(warm_up(server.url, max(args.timeout, WARM_UP_TIMEOUT)))
+        upstream_before = stub.requests, stub.errors, stub.busy_seconds
+        cpu_before, rss_before = server.cpu_seconds(), server.rss_bytes()
+
+        start = time.perf_counter()
+        results = asyncio.run(run_load(server.url, args))
+        wall = time.perf_counter() - start
+
+        cpu_after, rss_after = server.cpu_seconds(), server.rss_bytes()
+        upstream_requests = stub.requests - upstream_before[0]
+        upstream_errors = stub.errors - upstream_before[1]
+        upstream_seconds = stub.busy_seconds - upstream_before[2]
+    finally:
+        server.stop()
+        stub.stop()
+    # Taken from the load's own renders, so no extra probe lookup is counted.
+    cache_after = latest_lookups(*(r['cache_lookups'] for r in results))
+    hit_ratio = None
+    if cache_before is not None and cache_after is not None:
+        hits, misses = cache_after[0] - cache_before[0], cache_after[1] - cache_before[1]
+        if hits + misses:
+            hit_ratio = round(hits / (hits + misses), 3)
+
+    latencies = [l for r in results for l in r['latencies']]
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+
+    # Where a render's time goes: waiting on Groq, CPU in the server
+    # (Streamlit's rerun plus the app's pandas and plotly work, which can't be
+    # told apart from outside), and the rest, mostly waiting on the GIL or
+    # other sessions.
+    def per_render_ms(seconds):
+        return round(seconds / len(latencies) * 1000, 1) if latencies else None
+
+    render_ms = per_render_ms(sum(latencies))
+    upstream_ms = per_render_ms(upstream_seconds)
+    cpu_ms = per_render_ms(cpu_after - cpu_before) if None not in (cpu_before, cpu_after) else None
+    report = {
+        'target': 'one `streamlit run main.py` server process, driven over websockets',
+        'sessions': args.sessions,
+        'concurrency': args.concurrency,
+        'renders': len(latencies),
+        'wall_seconds': round(wall, 3),
+        'renders_per_second': round(len(latencies) / wall, 2),
+        'render_p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+        'render_p99_ms': round(p99 * 1000, 1) if p99 is not None else None,
+        'render_mean_ms': render_ms,
+        'upstream_ms_per_render': upstream_ms,
+        'server_cpu_ms_per_render': cpu_ms,
+        'other_ms_per_render':
+            round(render_ms - upstream_ms - cpu_ms, 1) if None not in (render_ms, cpu_ms) else None,
+        'warm_render_ms': round(warm_render * 1000, 1) if warm_render is not None else None,
+        'render_errors': sum(r['errors'] for r in results),
+        'render_timeouts': sum(r['timeouts'] for r in results),
+        'session_failures': sum(r['failed'] for r in results),
+        'server_cpu_seconds_per_session':
+            round((cpu_after - cpu_before) / args.sessions, 3)
+            if None not in (cpu_before, cpu_after) else None,
+        'server_rss_mb': round(rss_after / 2**20, 1) if rss_after is not None else None,
+        'server_rss_growth_mb_per_session':
+            round((rss_after - rss_before) / 2**20 / args.sessions, 3)
+            if None not in (rss_before, rss_after) else None,
+        'cache_hit_ratio': hit_ratio,
+        'upstream_requests': upstream_requests,
+        'upstream_errors': upstream_errors,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        width = max(len(k) for k in report)
+        for key, value in report.items():
+            print(f"{key:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import streamlit as st
 import plotly.graph_objects as go
+import pandas as pd
 #from components.market_metrics import MarketMetrics
 from components.market_metrics import CurrencyMetrics
+from utils.cache import cache_stats
 #from components.sentiment_analysis import SentimentAnalysis
 #from components.technical_fundamentals import TechnicalFundamentals
 
@@ -55,6 +57,13 @@ def main():
  #    with tab3:
     #technical_fundamentals.display(selected_crypto)
     
+    # Cache memory usage
+    stats = cache_stats()
+    with st.sidebar.expander("Cache usage"):
+        st.caption(f"{stats['total_bytes'] / 2**20:.1f} MB of {stats['max_bytes'] / 2**20:.0f} MB")
+        if stats['functions']:
+            st.dataframe(pd.DataFrame.from_dict(stats['functions'], orient='index'))
+    
     # Footer
     st.markdown("---")
     st.markdown(
@@ -0,0 +1,221 @@
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import cache
+from utils.cache import CacheManager, cached, cache_manager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def payload(n):
+    return {'data': 'x' * n}
+
+
+def test_byte_accounting():
+    manager = CacheManager()
+    value = manager.put('a', 'f', payload(1000))
+    stats = manager.stats()
+    assert stats['total_bytes'] == cache._sizeof(value)
+    assert stats['functions']['f']['bytes'] == stats['total_bytes']
+    assert stats['functions']['f']['entries'] == 1
+
+    manager.clear()
+    stats = manager.stats()
+    assert stats['total_bytes'] == 0
+    assert stats['functions']['f'] == {
+        'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0
+    }
+
+
+def test_frozen_dict_counts_underlying_dict():
+    frozen = cache._freeze({i: i for i in range(1000)})
+    assert cache._sizeof(frozen) > sys.getsizeof({i: i for i in range(1000)})
+
+
+def test_lru_eviction_by_size():
+    size = cache._sizeof(cache._freeze(payload(1000)))
+    manager = CacheManager(max_bytes=size * 2)
+    manager.put('a', 'f', payload(1000))
+    manager.put('b', 'f', payload(1000))
+    assert manager.get('a')[0]
+
+    manager.put('c', 'f', payload(1000))
+    assert manager.get('a')[0]
+    assert not manager.get('b')[0]
+    assert manager.get('c')[0]
+    assert manager.stats()['functions']['f']['evictions'] == 1
+    assert manager.stats()['total_bytes'] <= manager.max_bytes
+
+
+def test_max_entries_only_evicts_own_function():
+    manager = CacheManager()
+    manager.put('g1', 'g', payload(10))
+    manager.put('f1', 'f', payload(10), max_entries=2)
+    manager.put('f2', 'f', payload(10), max_entries=2)
+    manager.put('f3', 'f', payload(10), max_entries=2)
+    assert not manager.get('f1')[0]
+    assert manager.get('f2')[0] and manager.get('f3')[0]
+    assert manager.get('g1')[0]
+    assert manager.stats()['functions']['f']['entries'] == 2
+
+
+def test_ttl_expiry(clock):
+    manager = CacheManager()
+    manager.put('a', 'f', payload(10), ttl=10)
+    clock[0] += 5
+    assert manager.get('a')[0]
+    clock[0] += 10
+    assert not manager.get('a')[0]
+    assert manager.stats()['total_bytes'] == 0
+
+
+def test_expired_entries_swept_before_eviction(clock):
+    size = cache._sizeof(cache._freeze(payload(1000)))
+    manager = CacheManager(max_bytes=size * 2)
+    manager.put('stale', 'f', payload(1000), ttl=1)
+    manager.put('live', 'f', payload(1000))
+    clock[0] += 5
+    manager.put('new', 'f', payload(1000))
+    assert manager.get('live')[0]
+    assert manager.get('new')[0]
+    stats = manager.stats()
+    assert stats['functions']['f']['entries'] == 2
+    assert stats['functions']['f']['evictions'] == 0
+
+
+def test_oversized_value_served_uncached():
+    manager = CacheManager(max_bytes=100)
+    value = manager.put('a', 'f', payload(1000))
+    assert value['data'] == 'x' * 1000
+    assert not manager.get('a')[0]
+    assert manager.stats()['total_bytes'] == 0
+
+
+def test_concurrent_misses_compute_once():
+    manager = CacheManager()
+    calls = []
+    barrier = threading.Barrier(10)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return payload(10)
+
+    def worker():
+        barrier.wait()
+        manager.get_or_compute('a', 'f', compute)
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    stats = manager.stats()['functions']['f']
+    assert stats['misses'] == 1
+    assert stats['hits'] == 9
+    assert not manager._compute_locks
+
+
+def test_cached_hashes_unhashable_arguments():
+    calls = []
+
+    @cached()
+    def total(values, options):
+        calls.append(1)
+        return sum(values)
+
+    try:
+        assert total([1, 2], {'a': [3]}) == 3
+        assert total([1, 2], {'a': [3]}) == 3
+        assert total([1, 3], {'a': [3]}) == 4
+        assert len(calls) == 2
+    finally:
+        total.clear()
+
+
+def test_cached_keys_include_argument_type():
+    @cached()
+    def describe(value):
+        return type(value).__name__
+
+    try:
+        assert describe(1) == 'int'
+        assert describe(True) == 'bool'
+        assert describe(1.0) == 'float'
+        assert describe(1) == 'int'
+    finally:
+        describe.clear()
+
+
+def test_cached_rejects_unhashable_objects():
+    class Unhashable:
+        __hash__ = None
+
+    @cached()
+    def f(value):
+        return value
+
+    with pytest.raises(TypeError, match="argument 'value'"):
+        f(Unhashable())
+
+
+def test_cached_dataframes_are_safe_to_modify():
+    @cached()
+    def frame(symbol):
+        return pd.DataFrame({
+            'p': [1.0, 2.0],
+            'ts': pd.date_range('2024-01-01', periods=2, tz='UTC'),
+        })
+
+    try:
+        df = frame('BTC')
+        df.loc[0, 'p'] = 9
+        df['p'] *= 2
+        df.loc[0, 'ts'] = pd.Timestamp('2000-01-01', tz='UTC')
+
+        again = frame('BTC')
+        assert again['p'].tolist() == [1.0, 2.0]
+        assert again.loc[0, 'ts'] == pd.Timestamp('2024-01-01', tz='UTC')
+        assert cache_manager.stats()['functions'][frame.__module__ + '.' + frame.__qualname__]['hits'] == 1
+    finally:
+        frame.clear()
+
+
+def test_cached_dataframe_hits_do_not_copy():
+    @cached()
+    def frame(symbol):
+        return pd.DataFrame({'p': np.arange(1000.0), 'v': np.arange(1000)})
+
+    try:
+        first, second = frame('BTC'), frame('BTC')
+        assert first is not second
+        for column in ('p', 'v'):
+            assert np.shares_memory(first[column].to_numpy(), second[column].to_numpy())
+    finally:
+        frame.clear()
+
+
+def test_cached_containers_are_read_only():
+    @cached()
+    def posts(symbol):
+        return [{'title': symbol}]
+
+    try:
+        result = posts('BTC')
+        with pytest.raises(TypeError):
+            result[0]['title'] = 'ETH'
+        assert posts('BTC')[0]['title'] == 'BTC'
+    finally:
+        posts.clear()
@@ -0,0 +1,255 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import MappingProxyType
+
+import pandas as pd
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Cached DataFrames are handed out as shallow copies that share buffers
+# with the cached frame. Copy-on-write (the default from pandas 3) makes
+# a write copy the affected column instead of changing the shared buffer.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+def _freeze(value):
+    # Containers are handed out by reference, so make them read-only
+    # instead of copying them on every hit.
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _view(value):
+    # A shallow copy shares the cached buffers; copy-on-write duplicates
+    # only the ones the caller writes to.
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    return value
+
+
+def _hash_arg(name, value):
+    if isinstance(value, pd.DataFrame):
+        return ('DataFrame', tuple(value.columns),
+                pd.util.hash_pandas_object(value).values.tobytes())
+    if isinstance(value, pd.Series):
+        return ('Series', value.name, pd.util.hash_pandas_object(value).values.tobytes())
+    if isinstance(value, dict):
+        return ('dict', tuple((_hash_arg(name, k), _hash_arg(name, v))
+                              for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_hash_arg(name, v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ('set', frozenset(_hash_arg(name, v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(
+            f"Cannot cache on argument '{name}' of type {type(value).__name__}; "
+            f"prefix it with an underscore to leave it out of the cache key"
+        ) from None
+    # Keep equal values of different types, like 1, 1.0 and True, apart.
+    return (type(value).__qualname__, value)
+
+
+def _sizeof(value, seen=None):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, MappingProxyType):
+        # The proxy itself is tiny; count the dict it wraps.
+        size += sys.getsizeof(dict(value))
+    if isinstance(value, (dict, MappingProxyType)):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(v, seen) for v in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ('func_name', 'value', 'size', 'expires')
+
+    def __init__(self, func_name, value, size, expires):
+        self.func_name = func_name
+        self.value = value
+        self.size = size
+        self.expires = expires
+
+
+class CacheManager:
+    """Process-wide cache shared by all ``cached`` functions.
+
+    Expired entries are dropped first, then entries are evicted
+    least-recently-used first until the total size of the stored values
+    fits in ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._compute_locks = {}
+        self._total_bytes = 0
+        self._stats = {}
+
+    def _func_stats(self, func_name):
+        return self._stats.setdefault(func_name, {
+            'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0
+        })
+
+    def _remove(self, key, evicted=False):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+        stats = self._func_stats(entry.func_name)
+        stats['entries'] -= 1
+        stats['bytes'] -= entry.size
+        if evicted:
+            stats['evictions'] += 1
+
+    def _remove_expired(self):
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items()
+                    if e.expires is not None and e.expires <= now]:
+            self._remove(key)
+
+    @contextmanager
+    def _compute_lock(self, key):
+        # One lock per key, so concurrent misses on the same key compute it
+        # once while unrelated keys don't wait on each other.
+        with self._lock:
+            lock_users = self._compute_locks.setdefault(key, [threading.Lock(), 0])
+            lock_users[1] += 1
+        try:
+            with lock_users[0]:
+                yield
+        finally:
+            with self._lock:
+                lock_users[1] -= 1
+                if not lock_users[1]:
+                    del self._compute_locks[key]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry.expires is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            self._func_stats(entry.func_name)['hits'] += 1
+            return True, entry.value
+
+    def get_or_compute(self, key, func_name, compute, ttl=None, max_entries=None):
+        hit, value = self.get(key)
+        if hit:
+            return value
+        with self._compute_lock(key):
+            # Another thread may have computed it while we waited.
+            hit, value = self.get(key)
+            if hit:
+                return value
+            with self._lock:
+                self._func_stats(func_name)['misses'] += 1
+            return self.put(key, func_name, compute(), ttl=ttl, max_entries=max_entries)
+
+    def put(self, key, func_name, value, ttl=None, max_entries=None):
+        value = _freeze(value)
+        size = _sizeof(value)
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            stats = self._func_stats(func_name)
+            if key in self._entries:
+                self._remove(key)
+            self._remove_expired()
+            if size > self.max_bytes:
+                # Too large to ever fit; serve it uncached.
+                return value
+            self._entries[key] = _Entry(func_name, value, size, expires)
+            self._total_bytes += size
+            stats['entries'] += 1
+            stats['bytes'] += size
+            if max_entries is not None and stats['entries'] > max_entries:
+                oldest = next(k for k, e in self._entries.items() if e.func_name == func_name)
+                self._remove(oldest, evicted=True)
+            while self._total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)), evicted=True)
+            return value
+
+    def clear(self, func_name=None):
+        with self._lock:
+            for key in [k for k, e in self._entries.items()
+                        if func_name is None or e.func_name == func_name]:
+                self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_bytes': self.max_bytes,
+                'total_bytes': self._total_bytes,
+                'functions': {name: dict(s) for name, s in self._stats.items()},
+            }
+
+
+cache_manager = CacheManager(
+    int(os.environ.get('PIGGY_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
+
+
+def cached(ttl=None, max_entries=None):
+    """Cache a function's results in ``cache_manager``, like ``st.cache_data``.
+
+    As with Streamlit, parameters whose name starts with an underscore are
+    left out of the cache key. The others must be hashable, or lists,
+    tuples, dicts, sets, Series or DataFrames, which are hashed by content.
+
+    Unlike ``st.cache_data``, hits are not copied. Dicts and lists come back
+    as read-only mappings and tuples shared between callers. A returned
+    DataFrame shares its buffers with the cached one and is safe to modify:
+    importing this module turns on pandas copy-on-write, so a write copies
+    only the columns it touches. DataFrames nested inside dicts or lists
+    are shared as-is, so don't modify them.
+    """
+    def decorator(func):
+        func_name = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func_name,) + tuple(
+                (name, _hash_arg(name, value)) for name, value in bound.arguments.items()
+                if not name.startswith('_')
+            )
+            value = cache_manager.get_or_compute(
+                key, func_name, lambda: func(*args, **kwargs),
+                ttl=ttl, max_entries=max_entries
+            )
+            return _view(value)
+
+        wrapper.clear = lambda: cache_manager.clear(func_name)
+        return wrapper
+
+    return decorator
+
+
+def cache_stats():
+    return cache_manager.stats()